@@ -7,14 +7,32 @@ to your AWTRIX 3 device.
 """
 
 import argparse
+import asyncio
+import base64
+import http.client
+import ipaddress
+import itertools
+import os
+import shutil
+import socket
 import sys
+import tempfile
+import threading
+import time
+import urllib.parse
 import urllib.request
-import urllib.error
 import json
+import logging
+import logging.handlers
+import queue
 import re
-import uuid
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+logger = logging.getLogger("upload_icons")
 
 
 # Default recommended icons for Stock Display
@@ -24,13 +42,361 @@ DEFAULT_ICONS = {
     "stock-neutral": 40161,
 }
 
+# LaMetric icon download URL template
+LAMETRIC_ICON_URL = "https://developer.lametric.com/content/apps/icon_thumbs/{icon_id}.{ext}"
+
+# Icon formats in order of preference (AWTRIX prefers GIF)
+ICON_FORMATS = ('gif', 'png')
+
+# Cache directory name for downloaded icons, below $XDG_CACHE_HOME or ~/.cache
+CACHE_DIR_NAME = "ha-awtrix-icons"
+
 # HTTP request timeout in seconds
 REQUEST_TIMEOUT = 10
 
+# Maximum number of keep-alive connections open per host
+POOL_MAXSIZE = 8
+
+# Redirects followed per request, and the statuses that are followed
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Chunk size in bytes for streaming icon files to and from the network
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Multipart boundaries only need to be unique within a request, so a random
+# prefix drawn once per run plus a counter replaces a uuid4() per upload
+_BOUNDARY_PREFIX = secrets.token_hex(8)
+_boundary_counter = itertools.count()
+
+# Multipart part header template, filled with the boundary, file name and extension
+_PART_HEADER = (
+    b'--%b\r\n'
+    b'Content-Disposition: form-data; name="data"; filename="/ICONS/%b"\r\n'
+    b'Content-Type: image/%b\r\n\r\n'
+)
+
+# Icon contents, either in memory or in a (cache) file that is streamed on upload
+IconData = Union[bytes, Path]
+
+# Default number of icons processed at the same time
+DEFAULT_CONCURRENCY = 4
+
+# Precompiled patterns for address validation and icon name sanitizing
+_DOTTED_QUAD_RE = re.compile(r'^[0-9]{1,3}(\.[0-9]{1,3}){3}$')
+_HOSTNAME_RE = re.compile(r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$|^[a-zA-Z0-9]$')
+_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9\-_]')
+
+# Retries and backoff (in seconds) when LaMetric rate-limits us with HTTP 429
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 1.0
+RATE_LIMIT_MAX_WAIT = 30.0
+
+
+class Response(NamedTuple):
+    """Status, headers and body of a completed HTTP request."""
+    status: int
+    headers: http.client.HTTPMessage
+    data: bytes
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP(S) connections.
+
+    urllib opens a new TCP (and TLS) connection for every request. The pool keeps
+    idle connections per host instead, so all LaMetric downloads share one TLS
+    session and all AWTRIX uploads share one socket.
+
+    At most maxsize connections are open per host, further requests wait for a
+    free one. Plain HTTP hosts (the AWTRIX device) that resolve to a single
+    address are resolved only once, so new connections skip slow DNS or mDNS
+    lookups.
+
+    Like urlopen, the pool follows redirects and honours the HTTP(S)_PROXY and
+    NO_PROXY environment variables.
+    """
+
+    def __init__(self, maxsize: int = POOL_MAXSIZE, timeout: float = REQUEST_TIMEOUT):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._slots: Dict[Tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self._addresses: Dict[Tuple[str, int], str] = {}
+        self._proxies = urllib.request.getproxies()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _resolve(self, host: str, port: int) -> str:
+        with self._lock:
+            address = self._addresses.get((host, port))
+        if address is not None:
+            return address
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)}
+        except OSError:
+            # Let the connection attempt report the error
+            return host
+        # Only pin a single address; for dual-stack names keep connecting by
+        # name so every address is tried in turn
+        address = addresses.pop() if len(addresses) == 1 else host
+        with self._lock:
+            self._addresses[(host, port)] = address
+        return address
+
+    def _proxy(self, scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        if '://' not in proxy:
+            proxy = f'http://{proxy}'
+        return urllib.parse.urlsplit(proxy)
+
+    @staticmethod
+    def _proxy_headers(proxy: urllib.parse.SplitResult) -> Dict[str, str]:
+        if proxy.username is None:
+            return {}
+        credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+        return {'Proxy-Authorization': 'Basic ' + base64.b64encode(credentials.encode()).decode('ascii')}
+
+    def _new_connection(self, scheme: str, host: str, port: int) -> http.client.HTTPConnection:
+        proxy = self._proxy(scheme, host)
+        if proxy is not None:
+            proxy_port = proxy.port or (443 if proxy.scheme == 'https' else 80)
+            if scheme == 'https':
+                # Tunnel TLS through the proxy with CONNECT
+                conn = http.client.HTTPSConnection(proxy.hostname, proxy_port, timeout=self.timeout)
+                conn.set_tunnel(host, port, headers=self._proxy_headers(proxy))
+                return conn
+            return http.client.HTTPConnection(proxy.hostname, proxy_port, timeout=self.timeout)
+        if scheme == 'https':
+            # Keep the hostname for TLS certificate verification
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(self._resolve(host, port), port, timeout=self.timeout)
+
+    def _slot(self, key: Tuple[str, str, int]) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.maxsize)
+            return self._slots[key]
+
+    def _acquire(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(*key), False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    def _split_url(url: str) -> Tuple[Tuple[str, str, int], str, str]:
+        parts = urllib.parse.urlsplit(url)
+        default_port = 443 if parts.scheme == 'https' else 80
+        key = (parts.scheme, parts.hostname, parts.port or default_port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return key, path, parts.netloc
+
+    def warm(self, url: str) -> None:
+        """
+        Resolve and connect to the host of a URL ahead of time.
+        
+        The connection is kept idle for the next request to that host. Errors
+        are ignored, the request itself will report them.
+        
+        Args:
+            url: Absolute http:// or https:// URL
+        """
+        key, _, _ = self._split_url(url)
+        with self._slot(key):
+            conn = self._new_connection(*key)
+            try:
+                conn.connect()
+            except OSError:
+                conn.close()
+                return
+            self._release(key, conn)
+
+    @staticmethod
+    def _iter_body(body: Sequence[IconData]) -> Iterator[bytes]:
+        for part in body:
+            if isinstance(part, Path):
+                with open(part, 'rb') as f:
+                    while chunk := f.read(STREAM_CHUNK_SIZE):
+                        yield chunk
+            else:
+                yield part
+
+    @staticmethod
+    def _body_length(body: Sequence[IconData]) -> int:
+        return sum(part.stat().st_size if isinstance(part, Path) else len(part) for part in body)
+
+    def request(self, method: str, url: str, body: Optional[Union[bytes, Sequence[IconData]]] = None,
+                headers: Optional[Dict[str, str]] = None, stream_to: Optional[BinaryIO] = None) -> Response:
+        """
+        Send an HTTP request over a pooled connection, following redirects.
+        
+        Args:
+            method: HTTP method (GET, POST, ...)
+            url: Absolute http:// or https:// URL
+            body: Optional request body, either bytes or a sequence of bytes
+                chunks and file paths that are sent one after another without
+                being joined; files are read in chunks
+            headers: Optional request headers; Content-Length is set from the
+                body automatically
+            stream_to: Optional binary file that a successful (200) response
+                body is copied to in chunks instead of being read into memory
+            
+        Returns:
+            The final response, with an empty body if it was streamed to a file
+            
+        Raises:
+            OSError: If the connection fails or times out
+            http.client.HTTPException: If the server sends an invalid response
+                or redirects too often
+        """
+        headers = dict(headers or {})
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(method, url, body, headers, stream_to)
+            location = response.headers.get('Location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            
+            url = urllib.parse.urljoin(url, location)
+            if urllib.parse.urlsplit(url).scheme not in ('http', 'https'):
+                return response
+            # Like urlopen, turn redirected POSTs into GETs without a body
+            if response.status == 303 or (response.status in (301, 302) and method == 'POST'):
+                method, body = 'GET', None
+                headers = {k: v for k, v in headers.items()
+                           if k.lower() not in ('content-type', 'content-length')}
+        
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+
+    def _send(self, method: str, url: str, body: Optional[Union[bytes, Sequence[IconData]]],
+              headers: Dict[str, str], stream_to: Optional[BinaryIO]) -> Response:
+        key, path, netloc = self._split_url(url)
+        headers = dict(headers)
+        if key[0] == 'http':
+            # Connections go to the resolved address, keep the original Host header
+            headers.setdefault('Host', netloc)
+            proxy = self._proxy(*key[:2])
+            if proxy is not None:
+                # Plain HTTP proxies expect the absolute URL as request target
+                path = f'http://{netloc}{path}'
+                headers.update(self._proxy_headers(proxy))
+        if body is not None and not isinstance(body, (bytes, bytearray)):
+            # http.client would fall back to chunked encoding for an iterable body,
+            # which small embedded HTTP servers such as AWTRIX do not handle
+            headers.setdefault('Content-Length', str(self._body_length(body)))
+        
+        with self._slot(key):
+            while True:
+                conn, reused = self._acquire(key)
+                if stream_to is not None:
+                    stream_to.seek(0)
+                    stream_to.truncate()
+                try:
+                    request_body = body
+                    if body is not None and not isinstance(body, (bytes, bytearray)):
+                        request_body = self._iter_body(body)
+                    conn.request(method, path, body=request_body, headers=headers)
+                    response = conn.getresponse()
+                    if stream_to is not None and response.status == 200:
+                        shutil.copyfileobj(response, stream_to, STREAM_CHUNK_SIZE)
+                        data = b''
+                    else:
+                        data = response.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    conn.close()
+                    # The server dropped an idle keep-alive connection, retry on a fresh one
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+                
+                # http.client reconnects automatically if the server asked to close
+                self._release(key, conn)
+                return Response(response.status, response.headers, data)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+# Shared connection pool for LaMetric downloads and AWTRIX uploads
+POOL = ConnectionPool()
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route progress messages through a queue written to stdout by one thread.
+    
+    Concurrent downloads and uploads then neither block on stdout nor
+    interleave their output.
+    
+    Returns:
+        The started listener; stop it to flush pending messages
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+def normalize_address(address: str) -> str:
+    """
+    Strip leading zeros from the octets of a dotted-quad IPv4 address.
+    
+    The ipaddress module rejects addresses such as 192.168.001.100, and some
+    resolvers would read the zero-padded octets as octal.
+    
+    Args:
+        address: IP address or hostname
+        
+    Returns:
+        The address with canonical IPv4 octets, other addresses unchanged
+    """
+    if _DOTTED_QUAD_RE.match(address):
+        return '.'.join(str(int(octet)) for octet in address.split('.'))
+    return address
+
 
 def validate_ip_or_hostname(address: str) -> bool:
     """
-    Validate if the address is a valid IP address or hostname.
+    Validate if the address is a valid IPv4/IPv6 address or hostname.
+    
+    IPv4 addresses need all four octets; shorthand forms such as 1.2.3 are
+    rejected. Leading zeros in octets are allowed.
     
     Args:
         address: IP address or hostname to validate
@@ -42,22 +408,40 @@ def validate_ip_or_hostname(address: str) -> bool:
         return False
     
     # Check for localhost
-    if address in ['localhost', '127.0.0.1']:
+    if address == 'localhost':
         return True
     
-    # Check for IPv4
-    ipv4_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-    if re.match(ipv4_pattern, address):
-        # Verify each octet is <= 255
-        try:
-            octets = address.split('.')
-            return all(0 <= int(octet) <= 255 for octet in octets)
-        except (ValueError, AttributeError):
-            return False
+    # Check for IPv4 or IPv6
+    try:
+        ipaddress.ip_address(normalize_address(address))
+        return True
+    except ValueError:
+        pass
+    
+    # Reject malformed IPs such as 256.1.1.1 or 1.2.3, a top-level label is never all-numeric
+    if address.rsplit('.', 1)[-1].isdigit():
+        return False
     
     # Check for hostname (simplified check, allows single char labels)
-    hostname_pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$|^[a-zA-Z0-9]$'
-    return bool(re.match(hostname_pattern, address))
+    return bool(_HOSTNAME_RE.match(address))
+
+
+def format_url_host(address: str) -> str:
+    """
+    Format an address for use as the host part of a URL.
+    
+    Args:
+        address: IP address or hostname
+        
+    Returns:
+        The address, with IPv6 addresses enclosed in brackets
+    """
+    try:
+        if ipaddress.ip_address(address).version == 6:
+            return f"[{address}]"
+    except ValueError:
+        pass
+    return address
 
 
 def sanitize_icon_name(name: str) -> str:
@@ -71,122 +455,406 @@ def sanitize_icon_name(name: str) -> str:
         Sanitized name with only alphanumeric, hyphens, and underscores
     """
     # Replace any character that's not alphanumeric, hyphen, or underscore
-    sanitized = re.sub(r'[^a-zA-Z0-9\-_]', '_', name)
+    sanitized = _SANITIZE_RE.sub('_', name)
     # Remove any leading/trailing underscores
     sanitized = sanitized.strip('_')
     return sanitized if sanitized else "icon"
 
 
-def download_icon(icon_id: int) -> Tuple[bytes, str]:
+def _retry_after(response: Response, attempt: int) -> float:
+    """
+    Compute how long to wait before retrying a rate-limited request.
+    
+    Args:
+        response: The HTTP 429 response
+        attempt: Zero-based retry attempt
+        
+    Returns:
+        Delay in seconds, from Retry-After if given, exponential backoff otherwise
+    """
+    retry_after = response.headers.get('Retry-After', '')
+    try:
+        delay = float(retry_after)
+    except ValueError:
+        delay = RATE_LIMIT_BACKOFF * 2 ** attempt
+    return min(max(delay, 0.0), RATE_LIMIT_MAX_WAIT)
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory where downloaded icons are cached between runs.
+    
+    Returns:
+        Path to the icon cache directory (may not exist yet)
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / CACHE_DIR_NAME
+
+
+def _find_cached_icon(icon_id: int) -> Optional[Tuple[Path, str]]:
+    """
+    Look up an icon in the disk cache.
+    
+    Args:
+        icon_id: The LaMetric icon ID
+        
+    Returns:
+        Tuple of (cache_path, file_extension), or None if the icon is not cached
+        or the cached file cannot be read
+    """
+    for ext in ICON_FORMATS:
+        path = get_cache_dir() / f"{icon_id}.{ext}"
+        if path.is_file():
+            # e.g. a file cached by a run as another user, download it again
+            return (path, ext) if os.access(path, os.R_OK) else None
+    return None
+
+
+def _read_last_modified(path: Path) -> Optional[str]:
+    """Read the Last-Modified value stored next to a cached icon, if any."""
+    try:
+        with open(f"{path}.json", encoding='utf-8') as f:
+            return json.load(f).get('last_modified')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _store_cached_icon(temp_path: Path, icon_id: int, ext: str, last_modified: Optional[str]) -> IconData:
+    """
+    Move a downloaded icon from its temporary file to its final cache location.
+    
+    Failures are reported but not fatal, the icon can still be uploaded.
+    
+    Args:
+        temp_path: Temporary file in the cache directory holding the icon
+        icon_id: The LaMetric icon ID
+        ext: File extension (png or gif)
+        last_modified: Last-Modified header sent by LaMetric, if any
+        
+    Returns:
+        The cached icon path, or the icon bytes if it could not be cached
+    """
+    path = temp_path.with_name(f"{icon_id}.{ext}")
+    try:
+        # The icon was written to a temporary file first so concurrent runs
+        # never see partial icons. Temporary files are private (0600), give
+        # the cached icon the usual permissions of a new file
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except OSError as e:
+        # Any file already at path is a stale copy, upload the new download
+        logger.warning(f"  ! Could not cache icon {icon_id}: {e}")
+        data = temp_path.read_bytes()
+        temp_path.unlink(missing_ok=True)
+        return data
+    
+    try:
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump({'last_modified': last_modified}, f)
+    except OSError as e:
+        logger.warning(f"  ! Could not store cache metadata for icon {icon_id}: {e}")
+    return path
+
+
+def _fetch_lametric(url: str, headers: Optional[Dict[str, str]] = None,
+                    stream_to: Optional[BinaryIO] = None) -> Response:
+    """
+    GET a LaMetric URL, retrying when rate-limited with HTTP 429.
+    
+    Args:
+        url: LaMetric URL to fetch
+        headers: Optional request headers
+        stream_to: Optional binary file that a successful response is written to
+        
+    Returns:
+        The final response
+    """
+    response = POOL.request('GET', url, headers=headers, stream_to=stream_to)
+    for attempt in range(RATE_LIMIT_RETRIES):
+        if response.status != 429:
+            break
+        time.sleep(_retry_after(response, attempt))
+        response = POOL.request('GET', url, headers=headers, stream_to=stream_to)
+    return response
+
+
+def _fetch_icon_format(icon_id: int, url: str, headers: Dict[str, str],
+                       cache_dir: Optional[Path]) -> Tuple[Response, Optional[IconData]]:
+    """
+    Download one format of an icon from LaMetric.
+    
+    A successful response is streamed into a temporary file in the cache
+    directory, so the icon is never held in memory as a whole. If no file
+    can be created there, the icon is downloaded into memory instead.
+    
+    Args:
+        icon_id: The LaMetric icon ID, for warnings
+        url: LaMetric icon URL
+        headers: Request headers
+        cache_dir: Existing cache directory, or None to download into memory
+        
+    Returns:
+        Tuple of (response, icon_data), where icon_data is the temporary file
+        (or the bytes without cache directory) and None unless the download
+        succeeded
+    """
+    temp_file = None
+    if cache_dir is not None:
+        try:
+            temp_file = tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp', delete=False)
+        except OSError as e:
+            # e.g. a cache directory left behind by a run as another user
+            logger.warning(f"  ! Could not cache icon {icon_id}: {e}")
+    if temp_file is None:
+        response = _fetch_lametric(url, headers)
+        return response, response.data if response.status == 200 and response.data else None
+    
+    with temp_file as f:
+        temp_path = Path(f.name)
+        try:
+            response = _fetch_lametric(url, headers, stream_to=f)
+            size = f.tell()
+        except BaseException:
+            f.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+    
+    if response.status == 200 and size:
+        return response, temp_path
+    temp_path.unlink(missing_ok=True)
+    return response, None
+
+
+async def download_icon(icon_id: int, use_cache: bool = True,
+                        refresh: bool = False) -> Tuple[IconData, str]:
     """
     Download an icon from LaMetric by its ID.
     
+    Icons are streamed into a disk cache, so later runs do not contact
+    LaMetric at all.
+    
     Args:
         icon_id: The LaMetric icon ID
+        use_cache: Return a cached copy if there is one. If False, the cache
+            is ignored and the icon is always downloaded again.
+        refresh: Only reuse a cached copy when LaMetric reports it as not
+            modified
         
     Returns:
-        Tuple of (icon_data, file_extension)
+        Tuple of (icon_data, file_extension), where icon_data is the path of
+        the cached icon, or its bytes if the cache directory is not writable
         
     Raises:
-        urllib.error.URLError: If download fails
+        OSError: If the connection to LaMetric fails
+        ValueError: If the icon is not available in any format
     """
-    # Try GIF first (preferred by AWTRIX), then PNG
-    for ext in ['gif', 'png']:
-        url = f"https://developer.lametric.com/content/apps/icon_thumbs/{icon_id}.{ext}"
-        try:
-            with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
-                data = response.read()
-                if data:
-                    print(f"  ✓ Downloaded icon {icon_id} ({ext.upper()}, 8x8)")
-                    return data, ext
-        except urllib.error.HTTPError:
-            continue
+    cached = _find_cached_icon(icon_id) if use_cache else None
+    if cached and not refresh:
+        cache_path, ext = cached
+        logger.info(f"  ✓ Using cached icon {icon_id} ({ext.upper()}, 8x8)")
+        return cache_path, ext
+    
+    cache_dir: Optional[Path] = get_cache_dir()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"  ! Could not cache icon {icon_id}: {e}")
+        cache_dir = None
+    
+    # Try GIF first (preferred by AWTRIX), then PNG; the PNG is only requested
+    # when there is no GIF, so LaMetric gets one request per icon where possible
+    for ext in ICON_FORMATS:
+        url = LAMETRIC_ICON_URL.format(icon_id=icon_id, ext=ext)
+        headers = {}
+        if cached and cached[1] == ext:
+            last_modified = _read_last_modified(cached[0])
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response, icon_data = await asyncio.to_thread(_fetch_icon_format, icon_id, url, headers, cache_dir)
+        # A 304 only counts if we sent If-Modified-Since, proxies may send it anyway
+        if response.status == 304 and cached:
+            if cached[0].is_file():
+                logger.info(f"  ✓ Cached icon {icon_id} is up to date ({ext.upper()}, 8x8)")
+                return cached[0], ext
+            response, icon_data = await asyncio.to_thread(_fetch_icon_format, icon_id, url, {}, cache_dir)
+        if icon_data is not None:
+            logger.info(f"  ✓ Downloaded icon {icon_id} ({ext.upper()}, 8x8)")
+            if isinstance(icon_data, Path):
+                icon_data = _store_cached_icon(icon_data, icon_id, ext, response.headers.get('Last-Modified'))
+            return icon_data, ext
     
     raise ValueError(f"Could not download icon {icon_id} - icon not found or server error")
 
 
-
-def upload_icon_to_awtrix(device_ip: str, icon_name: str, icon_data: bytes, file_ext: str) -> bool:
+def upload_icons_to_awtrix(device_ip: str, icons: Sequence[Tuple[str, IconData, str]]) -> bool:
     """
-    Upload an icon to AWTRIX device via HTTP.
+    Upload one or more icons to AWTRIX device in a single HTTP request.
     
     Args:
         device_ip: IP address of the AWTRIX device
-        icon_name: Name for the icon file (without extension)
-        icon_data: Binary icon data
-        file_ext: File extension (png or gif)
+        icons: Sequence of (safe_icon_name, icon_data, file_ext) tuples, where
+            safe_icon_name is the sanitized file name without extension,
+            icon_data is the icon bytes or a file streamed from disk and
+            file_ext is png or gif
         
     Returns:
         True if successful, False otherwise
     """
-    # Sanitize the icon name to prevent path traversal or special character issues
-    safe_icon_name = sanitize_icon_name(icon_name)
-    
     # AWTRIX uses an /edit endpoint for file uploads
-    url = f"http://{device_ip}/edit"
+    url = f"http://{format_url_host(device_ip)}/edit"
     
     # Create multipart form data with unique boundary
-    boundary = f"----WebKitFormBoundary{uuid.uuid4().hex}"
-    
-    # Build the multipart body
-    body = []
-    body.append(f'--{boundary}'.encode())
-    body.append(f'Content-Disposition: form-data; name="data"; filename="/ICONS/{safe_icon_name}.{file_ext}"'.encode())
-    body.append(f'Content-Type: image/{file_ext}'.encode())
-    body.append(b'')
-    body.append(icon_data)
-    body.append(f'--{boundary}--'.encode())
-    body.append(b'')
-    
-    body_bytes = b'\r\n'.join(body)
-    
-    # Create request
-    req = urllib.request.Request(
-        url,
-        data=body_bytes,
-        headers={
-            'Content-Type': f'multipart/form-data; boundary={boundary}',
-            'Content-Length': str(len(body_bytes))
-        }
-    )
+    boundary = f"----WebKitFormBoundary{_BOUNDARY_PREFIX}{next(_boundary_counter):x}"
+    boundary_bytes = boundary.encode('ascii')
+    
+    # Build the multipart part headers and trailer; the icon data itself is sent
+    # as is between them instead of being copied into a joined body
+    body_parts = []
+    file_names = []
+    for safe_icon_name, icon_data, file_ext in icons:
+        file_name = f"{safe_icon_name}.{file_ext}"
+        file_names.append(file_name)
+        # Sanitized names, extensions and the boundary are plain ASCII
+        body_parts.append(_PART_HEADER % (boundary_bytes, file_name.encode('ascii'), file_ext.encode('ascii')))
+        body_parts.append(icon_data)
+        body_parts.append(b'\r\n')
+    body_parts.append(b'--%b--\r\n' % boundary_bytes)
+    
+    headers = {
+        'Content-Type': f'multipart/form-data; boundary={boundary}'
+    }
     
     try:
-        with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as response:
-            if response.status in [200, 201]:
-                print(f"  ✓ Uploaded {safe_icon_name}.{file_ext} to AWTRIX")
-                return True
-            else:
-                print(f"  ✗ Upload failed with status {response.status}")
-                return False
-    except (urllib.error.URLError, OSError) as e:
-        print(f"  ✗ Upload failed: {e}")
+        response = POOL.request('POST', url, body=body_parts, headers=headers)
+        if response.status in [200, 201]:
+            for file_name in file_names:
+                logger.info(f"  ✓ Uploaded {file_name} to AWTRIX")
+            return True
+        else:
+            logger.error(f"  ✗ Upload of {', '.join(file_names)} failed with status {response.status}")
+            return False
+    except (http.client.HTTPException, OSError) as e:
+        logger.error(f"  ✗ Upload of {', '.join(file_names)} failed: {e}")
         return False
 
 
-def process_icon(device_ip: str, icon_name: str, icon_id: int) -> bool:
+def upload_icon_to_awtrix(device_ip: str, safe_icon_name: str, icon_data: IconData, file_ext: str) -> bool:
     """
-    Download an icon from LaMetric and upload it to AWTRIX.
+    Upload an icon to AWTRIX device via HTTP.
     
     Args:
         device_ip: IP address of the AWTRIX device
+        safe_icon_name: Sanitized name for the icon file (without extension)
+        icon_data: Binary icon data, or path of the icon file
+        file_ext: File extension (png or gif)
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    return upload_icons_to_awtrix(device_ip, [(safe_icon_name, icon_data, file_ext)])
+
+
+async def fetch_icon(icon_name: str, icon_id: int, use_cache: bool = True,
+                     refresh: bool = False) -> Optional[Tuple[IconData, str]]:
+    """
+    Download an icon from LaMetric, reporting any error.
+    
+    Args:
         icon_name: Name for the icon
         icon_id: LaMetric icon ID
+        use_cache: Reuse icons from the disk cache
+        refresh: Check LaMetric for updated versions of cached icons
         
     Returns:
-        True if successful, False otherwise
+        Tuple of (icon_data, file_extension), or None if the download failed
     """
-    print(f"\nProcessing {icon_name} (ID: {icon_id})...")
+    logger.info(f"Processing {icon_name} (ID: {icon_id})...")
     
     try:
-        # Download icon from LaMetric
-        icon_data, file_ext = download_icon(icon_id)
-        
-        # Upload to AWTRIX
-        return upload_icon_to_awtrix(device_ip, icon_name, icon_data, file_ext)
+        return await download_icon(icon_id, use_cache, refresh)
+    except (http.client.HTTPException, OSError, ValueError) as e:
+        logger.error(f"  ✗ Error processing {icon_name}: {e}")
+        return None
+
+
+async def run(device_ip: str, icons: Dict[str, int], concurrency: int = DEFAULT_CONCURRENCY,
+              use_cache: bool = True, refresh: bool = False, strict: bool = False) -> int:
+    """
+    Download all icons concurrently, then upload them to AWTRIX.
     
-    except (urllib.error.URLError, OSError, ValueError) as e:
-        print(f"  ✗ Error: {e}")
-        return False
+    The icons are uploaded in a single request to spare the device one HTTP
+    round trip per icon. If that fails, they are uploaded one by one so a
+    single bad icon does not fail the others.
+    
+    Args:
+        device_ip: IP address of the AWTRIX device
+        icons: Mapping of sanitized icon name to LaMetric icon ID
+        concurrency: Maximum number of icons processed at the same time, so the
+            AWTRIX HTTP server and LaMetric rate limits are not overwhelmed
+        use_cache: Reuse icons from the disk cache
+        refresh: Check LaMetric for updated versions of cached icons
+        strict: Upload nothing unless all icons were downloaded; icons that
+            have not started downloading when one fails are skipped
+        
+    Returns:
+        Number of icons uploaded successfully
+    """
+    sem = asyncio.Semaphore(concurrency)
+    aborted = asyncio.Event()
+    
+    # All blocking HTTP calls run in worker threads. Each icon in flight keeps
+    # one thread busy, plus one thread prewarms the AWTRIX connection
+    max_workers = min(concurrency, len(icons)) + 1
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload_icons'))
+    
+    async def bounded_fetch(icon_name: str, icon_id: int) -> Optional[Tuple[IconData, str]]:
+        async with sem:
+            if aborted.is_set():
+                return None
+            result = await fetch_icon(icon_name, icon_id, use_cache, refresh)
+            if result is None and strict:
+                aborted.set()
+            return result
+    
+    async def bounded_upload(icon_name: str, icon_data: IconData, file_ext: str) -> bool:
+        async with sem:
+            return await asyncio.to_thread(upload_icon_to_awtrix, device_ip, icon_name, icon_data, file_ext)
+    
+    with POOL:
+        # Connect to AWTRIX while the LaMetric downloads are in flight, so the
+        # first upload skips DNS resolution and the TCP handshake
+        prewarm = asyncio.create_task(
+            asyncio.to_thread(POOL.warm, f"http://{format_url_host(device_ip)}/"))
+        results = await asyncio.gather(*[
+            bounded_fetch(icon_name, icon_id)
+            for icon_name, icon_id in icons.items()
+        ])
+        await prewarm
+        
+        if aborted.is_set():
+            logger.error("  ✗ Not uploading any icons, not all icons could be downloaded (--strict)")
+            return 0
+        
+        downloaded = [
+            (icon_name, *result)
+            for icon_name, result in zip(icons, results)
+            if result is not None
+        ]
+        if not downloaded:
+            return 0
+        
+        if len(downloaded) > 1:
+            if await asyncio.to_thread(upload_icons_to_awtrix, device_ip, downloaded):
+                return len(downloaded)
+            logger.warning("  ! Batch upload failed, uploading icons one by one")
+        
+        uploaded = await asyncio.gather(*[
+            bounded_upload(icon_name, icon_data, file_ext)
+            for icon_name, icon_data, file_ext in downloaded
+        ])
+    return sum(uploaded)
 
 
 def main():
@@ -216,6 +884,33 @@ def main():
         help='Add a custom icon (can be used multiple times). Example: --icon my-icon 12345'
     )
     
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar='N',
+        help=f'Number of icons to process at the same time (default: {DEFAULT_CONCURRENCY})'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        dest='use_cache',
+        action='store_false',
+        help='Ignore cached icons and download all icons again from LaMetric'
+    )
+    
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Check LaMetric for updated versions of cached icons'
+    )
+    
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='Do not upload any icon unless all icons could be downloaded'
+    )
+    
     parser.add_argument(
         '--list-default',
         action='store_true',
@@ -245,7 +940,12 @@ def main():
     # Validate device IP format
     if not validate_ip_or_hostname(args.device_ip):
         print(f"Error: '{args.device_ip}' does not appear to be a valid IP address or hostname")
-        print("Please provide a valid IP address (e.g., 192.168.1.100) or hostname")
+        print("Please provide a valid IP address with all four numbers (e.g., 192.168.1.100) or hostname")
+        return 1
+    args.device_ip = normalize_address(args.device_ip)
+    
+    if args.concurrency <= 0:
+        print(f"Error: Concurrency must be a positive integer, got '{args.concurrency}'")
         return 1
     
     # Build list of icons to upload
@@ -255,13 +955,21 @@ def main():
         icons_to_upload.update(DEFAULT_ICONS)
     
     if args.icon:
+        custom_names = {}
         for name, icon_id in args.icon:
             try:
                 icon_id_int = int(icon_id)
                 if icon_id_int <= 0:
                     print(f"Error: Icon ID must be a positive integer, got '{icon_id}'")
                     return 1
-                icons_to_upload[name] = icon_id_int
+                # Sanitize the icon name once, before any network I/O, to prevent
+                # path traversal or special character issues
+                safe_name = sanitize_icon_name(name)
+                if custom_names.get(safe_name, name) != name:
+                    print(f"Warning: Icon names '{custom_names[safe_name]}' and '{name}' both map to "
+                          f"'{safe_name}', using ID {icon_id_int}")
+                custom_names[safe_name] = name
+                icons_to_upload[safe_name] = icon_id_int
             except ValueError:
                 print(f"Error: Icon ID must be a positive integer, got '{icon_id}'")
                 return 1
@@ -276,10 +984,12 @@ def main():
     print(f"Uploading {len(icons_to_upload)} icon(s) to AWTRIX at {args.device_ip}")
     print("=" * 60)
     
-    success_count = 0
-    for icon_name, icon_id in icons_to_upload.items():
-        if process_icon(args.device_ip, icon_name, icon_id):
-            success_count += 1
+    listener = setup_logging()
+    try:
+        success_count = asyncio.run(run(args.device_ip, icons_to_upload, args.concurrency,
+                                        args.use_cache, args.refresh, args.strict))
+    finally:
+        listener.stop()
     
     # Summary
     print()